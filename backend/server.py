@@ -1,35 +1,106 @@
-from fastapi import FastAPI, APIRouter, HTTPException
+from fastapi import FastAPI, APIRouter, Header, HTTPException, Query, Response
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from dotenv import load_dotenv
 from starlette.middleware.cors import CORSMiddleware
-from motor.motor_asyncio import AsyncIOMotorClient
+from bson import Binary
+from pymongo import ASCENDING, AsyncMongoClient, IndexModel, ReturnDocument, UpdateOne
+from async_lru import alru_cache
 import os
 import logging
 from pathlib import Path
 from pydantic import BaseModel, Field, HttpUrl
 from typing import List, Optional, Dict, Any
 import uuid
-from datetime import datetime
-from emergentintegrations.llm.chat import LlmChat, UserMessage
+from datetime import datetime, timedelta, timezone
 import asyncio
+import hashlib
+import httpx
+import itertools
 import re
+import zlib
+import numpy as np
+import orjson
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
 # MongoDB connection
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+client = AsyncMongoClient(mongo_url, tz_aware=True)
 db = client[os.environ['DB_NAME']]
 
 # OpenAI setup
 OPENAI_API_KEY = os.environ.get('OPENAI_API_KEY')
 
+# Shared OpenAI HTTP client so analyses reuse pooled TLS connections
+_openai_http = httpx.AsyncClient(
+    base_url="https://api.openai.com/v1",
+    headers={"Authorization": f"Bearer {OPENAI_API_KEY}"},
+    http2=True,
+    timeout=60,
+    limits=httpx.Limits(max_connections=100, max_keepalive_connections=50)
+)
+
+# Prior analyses supply few-shot context, so a smaller model is enough
+ANALYSIS_MODEL = os.environ.get('OPENAI_ANALYSIS_MODEL', 'gpt-4o-mini')
+FEW_SHOT_EXAMPLES = int(os.environ.get('FEW_SHOT_EXAMPLES', '3'))
+FEW_SHOT_CONTENT_CHARS = 600
+
+# Analysis cache settings
+ANALYSIS_CACHE_TTL_SECONDS = int(os.environ.get('ANALYSIS_CACHE_TTL_SECONDS', 7 * 24 * 3600))
+SEMANTIC_CACHE_THRESHOLD = float(os.environ.get('SEMANTIC_CACHE_THRESHOLD', '0.92'))
+SEMANTIC_CACHE_CANDIDATES = 200  # Most recent entries compared per industry
+EMBEDDING_DIM = 512
+
+# Bound concurrent OpenAI calls to the account's concurrency limit (per web worker, see WEB_CONCURRENCY)
+_llm_sem = asyncio.Semaphore(int(os.environ.get('LLM_CONCURRENCY', '8')))
+
+# Web worker processes started by __main__. Each one has its own LLM semaphore and analysis workers,
+# so LLM_CONCURRENCY and ANALYSIS_WORKERS are per worker: divide them by this when raising it
+WEB_CONCURRENCY = int(os.environ.get('WEB_CONCURRENCY', '1'))
+
+# Short-lived cache for single-lead reads polled by the dashboard. Writers can only invalidate their own
+# process's copy, so with several web workers another worker could serve a stale or deleted lead; the cache is off then
+LEAD_CACHE_TTL_SECONDS = 5
+LEAD_CACHE_ENABLED = WEB_CONCURRENCY == 1
+
+# Server-sent status events and long-polls for a single lead
+LEAD_STREAM_POLL_INTERVAL = 0.5  # seconds
+LEAD_STREAM_TIMEOUT = 120  # seconds
+ANALYSIS_DONE_STATUSES = ("completed", "failed")
+
+# Durable analysis queue backed by the analysis_jobs collection
+ANALYSIS_WORKERS = int(os.environ.get('ANALYSIS_WORKERS', os.environ.get('LLM_CONCURRENCY', '8')))
+JOB_MAX_ATTEMPTS = 3
+JOB_RETRY_BASE_SECONDS = 5
+JOB_LEASE_SECONDS = 300  # A running job is reclaimed after this long
+JOB_POLL_INTERVAL = 1.0  # seconds
+JOB_RETENTION_SECONDS = 24 * 3600
+_job_available = asyncio.Event()
+_job_workers: List[asyncio.Task] = []
+
+# Leads rescored per bulk_write
+RESCORE_BATCH_SIZE = 1000
+
+# Buffered lead updates, flushed to MongoDB as a single bulk_write
+WRITE_FLUSH_INTERVAL = 0.05  # seconds
+WRITE_FLUSH_MAX_BATCH = 500
+_pending_lead_updates: Dict[str, Dict[str, Any]] = {}
+_pending_update_waiters: Dict[str, List[asyncio.Future]] = {}
+_write_lock = asyncio.Lock()
+_flush_requested = asyncio.Event()
+_flusher_task: Optional[asyncio.Task] = None
+
 # Create the main app without a prefix
-app = FastAPI(title="Lead Generation System")
+app = FastAPI(title="Lead Generation System", default_response_class=ORJSONResponse)
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
 
+def utc_now() -> datetime:
+    """Current time as a timezone-aware UTC datetime"""
+    return datetime.now(timezone.utc)
+
 # Models
 class PainPoint(BaseModel):
     description: str
@@ -48,11 +119,33 @@ class Lead(BaseModel):
     recent_activity_summary: Optional[str] = None
     coldness_score: Optional[int] = Field(None, ge=1, le=10)
     total_lead_score: Optional[float] = None
+    lead_tier: Optional[str] = None  # hot, warm, cold
     best_outreach_angle: Optional[str] = None
     contact_info_quality: Optional[int] = Field(None, ge=1, le=5)
     analysis_status: str = "pending"  # pending, analyzing, completed, failed
-    created_at: datetime = Field(default_factory=datetime.utcnow)
-    updated_at: datetime = Field(default_factory=datetime.utcnow)
+    created_at: datetime = Field(default_factory=utc_now)
+    updated_at: datetime = Field(default_factory=utc_now)
+
+def _lead_from_mongo(doc: dict) -> Lead:
+    """Build a Lead from a stored document without re-validating it"""
+    # Documents were validated on write, so model_construct is safe and much cheaper
+    doc.pop("_id", None)
+    doc["pain_points"] = [PainPoint.model_construct(**pp) for pp in doc.get("pain_points", [])]
+    return Lead.model_construct(**doc)
+
+async def _fetch_lead(lead_id: str) -> Optional[Lead]:
+    """Read a lead straight from MongoDB"""
+    lead = await db.leads.find_one({"id": lead_id})
+    return _lead_from_mongo(lead) if lead else None
+
+# Writers must invalidate entries in this cache
+_get_lead_cached = alru_cache(maxsize=10_000, ttl=LEAD_CACHE_TTL_SECONDS)(_fetch_lead)
+
+async def read_lead(lead_id: str) -> Optional[Lead]:
+    """Read a lead through the short-lived cache when it is enabled"""
+    if LEAD_CACHE_ENABLED:
+        return await _get_lead_cached(lead_id)
+    return await _fetch_lead(lead_id)
 
 class LeadCreate(BaseModel):
     company_name: str
@@ -62,23 +155,111 @@ class LeadCreate(BaseModel):
     decision_maker_title: Optional[str] = None
     linkedin_url: Optional[str] = None
     manual_content: Optional[str] = None  # Manual content for analysis
+    no_cache: bool = False  # Skip the analysis cache for sensitive content
+
+# Row of the lead list, with the fields the list view and its detail modal display
+class LeadSummary(BaseModel):
+    id: str
+    company_name: str
+    industry: Optional[str] = None
+    company_size: Optional[str] = None
+    decision_maker_name: Optional[str] = None
+    decision_maker_title: Optional[str] = None
+    linkedin_url: Optional[str] = None
+    pain_points: List[PainPoint] = []
+    recent_activity_summary: Optional[str] = None
+    coldness_score: Optional[int] = None
+    total_lead_score: Optional[float] = None
+    best_outreach_angle: Optional[str] = None
+    analysis_status: str
+    created_at: datetime
+    updated_at: datetime
+
+LEAD_LIST_PROJECTION = {"_id": 0, **dict.fromkeys(LeadSummary.model_fields, 1)}
 
 class ActivityData(BaseModel):
     linkedin_posts: Optional[str] = None
     blog_posts: Optional[str] = None
     recent_announcements: Optional[str] = None
 
-async def analyze_with_gpt4(content: str, lead_data: dict) -> Dict[str, Any]:
-    """Analyze content using GPT-4o to extract pain points and generate insights"""
-    if not OPENAI_API_KEY:
-        raise HTTPException(status_code=500, detail="OpenAI API key not configured")
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+def embed_text(text: str) -> np.ndarray:
+    """Embed text as a normalized hashed bag of words and bigrams for near-duplicate matching"""
+    vector = np.zeros(EMBEDDING_DIM, dtype=np.float32)
+    tokens = _TOKEN_RE.findall(text.lower())
+    for feature in itertools.chain(tokens, map(" ".join, zip(tokens, tokens[1:]))):
+        # crc32 is stable across processes, unlike the builtin hash()
+        digest = zlib.crc32(feature.encode())
+        vector[digest % EMBEDDING_DIM] += 1.0 if digest & 0x80000000 else -1.0
     
-    try:
-        # Create chat instance
-        chat = LlmChat(
-            api_key=OPENAI_API_KEY,
-            session_id=f"lead_analysis_{lead_data['id']}",
-            system_message="""You are a B2B lead qualification expert. Your job is to analyze company information and identify business pain points, then provide actionable insights for sales outreach.
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+def embed_lead(content: str, lead_data: dict) -> np.ndarray:
+    """Embed the (industry, company_size, content) tuple used as the semantic cache key"""
+    return embed_text(f"{lead_data.get('industry') or ''}\n{lead_data.get('company_size') or ''}\n{content}")
+
+def _decode_embedding(stored) -> np.ndarray:
+    """Read a stored embedding; entries written before embeddings were packed hold a list of floats"""
+    if isinstance(stored, bytes):
+        return np.frombuffer(stored, dtype=np.float32)
+    return np.asarray(stored, dtype=np.float32)
+
+async def find_similar_analyses(embedding: np.ndarray, industry: Optional[str], limit: int) -> List[tuple]:
+    """Return up to limit (similarity, cache entry) pairs for recent analyses in the same industry, most similar first"""
+    # Rank on embeddings alone, then fetch the full entries only for the closest few
+    candidates = await db.lead_analysis_cache.find(
+        {"industry": industry},
+        {"embedding": 1}
+    ).sort("created_at", -1).to_list(SEMANTIC_CACHE_CANDIDATES)
+    if not candidates:
+        return []
+    
+    # Embeddings are unit length, so the dot product is the cosine similarity
+    similarities = np.stack([_decode_embedding(candidate["embedding"]) for candidate in candidates]) @ embedding
+    top = np.argsort(similarities)[::-1][:limit]
+    entries = await db.lead_analysis_cache.find(
+        {"_id": {"$in": [candidates[i]["_id"] for i in top]}},
+        {"analysis": 1, "company_size": 1, "content_excerpt": 1}
+    ).to_list(None)
+    entries_by_id = {entry["_id"]: entry for entry in entries}
+    return [
+        (float(similarities[i]), entries_by_id[candidates[i]["_id"]])
+        for i in top
+        if candidates[i]["_id"] in entries_by_id
+    ]
+
+async def store_cached_analysis(embedding: np.ndarray, content: str, lead_data: dict, analysis: Dict[str, Any]):
+    """Store an analysis in the semantic cache, which also serves as the few-shot example corpus"""
+    await db.lead_analysis_cache.insert_one({
+        "industry": lead_data.get('industry'),
+        "company_size": lead_data.get('company_size'),
+        "content_excerpt": content.strip()[:FEW_SHOT_CONTENT_CHARS],
+        # Packed float32 is 2 KB per entry, a quarter of the same vector as BSON doubles
+        "embedding": Binary(embedding.astype(np.float32).tobytes()),
+        "analysis": analysis,
+        "created_at": utc_now()
+    })
+
+def build_few_shot_block(similar: List[tuple]) -> str:
+    """Format the closest prior analyses that found pain points as prompt examples"""
+    examples = [
+        entry for _, entry in similar
+        if entry.get("content_excerpt") and entry["analysis"].get("pain_points")
+    ][:FEW_SHOT_EXAMPLES]
+    return "".join(
+        FEW_SHOT_EXAMPLE_TEMPLATE.format(
+            number=number,
+            company_size=entry.get("company_size") or 'Unknown',
+            content=entry["content_excerpt"],
+            analysis=orjson.dumps(entry["analysis"]).decode()
+        )
+        for number, entry in enumerate(examples, 1)
+    )
+
+# Analysis prompts, built once at import
+ANALYSIS_SYSTEM_PROMPT = """You are a B2B lead qualification expert. Your job is to analyze company information and identify business pain points, then provide actionable insights for sales outreach.
 
 Your analysis should focus on:
 1. Identifying specific business challenges and pain points
@@ -88,16 +269,14 @@ Your analysis should focus on:
 5. Assessing lead quality
 
 Be specific and actionable in your analysis."""
-        ).with_model("openai", "gpt-4o")
-        
-        # Construct analysis prompt
-        prompt = f"""
+
+ANALYSIS_PROMPT_TEMPLATE = """
 Analyze the following lead information and provide a comprehensive assessment:
 
-COMPANY: {lead_data.get('company_name', 'Unknown')}
-INDUSTRY: {lead_data.get('industry', 'Unknown')}
-COMPANY SIZE: {lead_data.get('company_size', 'Unknown')}
-DECISION MAKER: {lead_data.get('decision_maker_name', 'Unknown')} - {lead_data.get('decision_maker_title', 'Unknown')}
+COMPANY: {company_name}
+INDUSTRY: {industry}
+COMPANY SIZE: {company_size}
+DECISION MAKER: {decision_maker_name} - {decision_maker_title}
 
 CONTENT TO ANALYZE:
 {content}
@@ -124,45 +303,132 @@ Please provide your analysis in this exact JSON format:
 
 Focus on finding specific, actionable pain points that a B2B solution could address.
 """
+
+FEW_SHOT_EXAMPLE_TEMPLATE = """
+PRIOR EXAMPLE {number}:
+COMPANY SIZE: {company_size}
+CONTENT: {content}
+ANALYSIS: {analysis}
+"""
+
+ANALYSIS_PROMPT_FIELDS = ("company_name", "industry", "company_size", "decision_maker_name", "decision_maker_title")
+
+def validate_analysis(analysis: Dict[str, Any]) -> Dict[str, Any]:
+    """Check a model reply against the lead fields it fills and normalize its pain points; raises if it is malformed"""
+    pain_points = [PainPoint(**pp).model_dump() for pp in analysis.get("pain_points", [])]
+    coldness_score = analysis.get("coldness_score", 5)
+    if not isinstance(coldness_score, int) or not 1 <= coldness_score <= 10:
+        raise ValueError(f"coldness_score must be an integer from 1 to 10, got {coldness_score!r}")
+    return {**analysis, "pain_points": pain_points}
+
+async def analyze_with_gpt4(content: str, lead_data: dict, use_cache: bool = True) -> Dict[str, Any]:
+    """Analyze content using the OpenAI analysis model to extract pain points and generate insights"""
+    if not OPENAI_API_KEY:
+        raise HTTPException(status_code=500, detail="OpenAI API key not configured")
+    
+    try:
+        # Construct analysis prompt
+        prompt_fields = {field: lead_data.get(field, 'Unknown') for field in ANALYSIS_PROMPT_FIELDS}
+        prompt_fields["content"] = content
+        prompt = ANALYSIS_PROMPT_TEMPLATE.format_map(prompt_fields)
         
-        user_message = UserMessage(text=prompt)
-        response = await chat.send_message(user_message)
+        # Serve repeated prompts from the exact cache
+        if use_cache:
+            # The key covers everything sent, so a model or system prompt change does not serve stale replies
+            prompt_key = hashlib.sha256(f"{ANALYSIS_MODEL}\n{ANALYSIS_SYSTEM_PROMPT}\n{prompt}".encode()).hexdigest()
+            cached = await db.llm_exact_cache.find_one({"_id": prompt_key})
+            if cached:
+                return cached["analysis"]
         
-        # Extract JSON from response
-        import json
-        try:
-            # Try to find JSON in the response
-            json_match = re.search(r'\{.*\}', response, re.DOTALL)
-            if json_match:
-                analysis_result = json.loads(json_match.group())
-                return analysis_result
-            else:
-                # Fallback parsing
-                return {
-                    "pain_points": [{"description": "Analysis completed but formatting issue occurred", "urgency": 3, "category": "general"}],
-                    "coldness_factors": {"recent_activity": "Unable to parse activity data"},
-                    "coldness_score": 5,
-                    "best_outreach_angle": response[:200] + "...",
-                    "lead_quality_assessment": "Analysis completed with formatting issues",
-                    "recommended_action": "nurture_campaign"
-                }
-        except json.JSONDecodeError:
-            # Return basic analysis if JSON parsing fails
-            return {
-                "pain_points": [{"description": "Business challenges identified in content analysis", "urgency": 3, "category": "general"}],
-                "coldness_factors": {"recent_activity": "Content analysis completed"},
-                "coldness_score": 5,
-                "best_outreach_angle": "Follow up based on content analysis",
-                "lead_quality_assessment": "Moderate lead potential",
-                "recommended_action": "nurture_campaign"
-            }
+        # Serve near-duplicates from the semantic cache; otherwise the closest prior analyses become examples.
+        # Examples without pain points are skipped, so fetch a few spares
+        embedding = embed_lead(content, lead_data)
+        similar = []
+        if use_cache or FEW_SHOT_EXAMPLES:
+            similar = await find_similar_analyses(embedding, lead_data.get('industry'), max(1, FEW_SHOT_EXAMPLES * 2))
+        if use_cache and similar and similar[0][0] >= SEMANTIC_CACHE_THRESHOLD:
+            return similar[0][1]["analysis"]
+        
+        few_shot_block = build_few_shot_block(similar)
+        if few_shot_block:
+            prompt = f"{prompt}\nPrior analyses of similar leads in this industry, for reference:\n{few_shot_block}"
+        
+        # JSON mode guarantees the reply is a single JSON object
+        async with _llm_sem:
+            completion = await _openai_http.post("/chat/completions", json={
+                "model": ANALYSIS_MODEL,
+                "messages": [
+                    {"role": "system", "content": ANALYSIS_SYSTEM_PROMPT},
+                    {"role": "user", "content": prompt}
+                ],
+                "response_format": {"type": "json_object"}
+            })
+        completion.raise_for_status()
+        # Validate before caching, so a malformed reply is never replayed to later leads
+        analysis_result = validate_analysis(orjson.loads(orjson.loads(completion.content)["choices"][0]["message"]["content"]))
+        
+        if use_cache:
+            await db.llm_exact_cache.replace_one(
+                {"_id": prompt_key},
+                {"analysis": analysis_result, "created_at": utc_now()},
+                upsert=True
+            )
+            await store_cached_analysis(embedding, content, lead_data, analysis_result)
+        return analysis_result
             
     except Exception as e:
         logging.error(f"Error in GPT analysis: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Analysis failed: {str(e)}")
 
-def calculate_lead_score(pain_point_urgency: float, coldness_score: int, company_fit: int = 7, contact_quality: int = 5) -> float:
-    """Calculate total lead score based on the user's framework"""
+async def queue_lead_update(lead_id: str, fields: Dict[str, Any]) -> asyncio.Future:
+    """Buffer a $set for a lead; updates to the same lead coalesce into one write. The returned future resolves once it is stored"""
+    written = asyncio.get_running_loop().create_future()
+    async with _write_lock:
+        _pending_lead_updates.setdefault(lead_id, {}).update(fields)
+        _pending_update_waiters.setdefault(lead_id, []).append(written)
+        if len(_pending_lead_updates) >= WRITE_FLUSH_MAX_BATCH:
+            _flush_requested.set()
+    return written
+
+async def flush_lead_updates():
+    """Write all buffered lead updates in one round trip"""
+    # Holding the lock for the write keeps flushes for the same lead in order
+    async with _write_lock:
+        if not _pending_lead_updates:
+            return
+        updates = dict(_pending_lead_updates)
+        waiters = dict(_pending_update_waiters)
+        _pending_lead_updates.clear()
+        _pending_update_waiters.clear()
+        try:
+            await db.leads.bulk_write(
+                [UpdateOne({"id": lead_id}, {"$set": fields}) for lead_id, fields in updates.items()],
+                ordered=False
+            )
+        except Exception as e:
+            # Nothing was queued while the lock was held, so put the batch back as it was and retry on the next flush
+            logging.error(f"Failed to flush {len(updates)} lead updates, will retry: {str(e)}")
+            _pending_lead_updates.update(updates)
+            _pending_update_waiters.update(waiters)
+            return
+        for lead_id in updates:
+            _get_lead_cached.cache_invalidate(lead_id)
+        for written in itertools.chain.from_iterable(waiters.values()):
+            if not written.done():
+                written.set_result(None)
+
+async def lead_update_flusher():
+    """Flush buffered lead updates on an interval or once the batch is full"""
+    while True:
+        try:
+            await asyncio.wait_for(_flush_requested.wait(), WRITE_FLUSH_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
+        _flush_requested.clear()
+        await flush_lead_updates()
+
+def score_leads(pain_point_urgency: np.ndarray, coldness_score: np.ndarray, company_fit: np.ndarray, contact_quality: np.ndarray) -> np.ndarray:
+    """Calculate total lead scores based on the user's framework, for many leads at once"""
     # Convert pain point urgency to 0-10 scale
     pain_point_score = (pain_point_urgency / 5) * 10
     
@@ -177,7 +443,56 @@ def calculate_lead_score(pain_point_urgency: float, coldness_score: int, company
         (contact_quality * 0.1)
     )
     
-    return round(total_score, 2)
+    return np.round(total_score, 2)
+
+def calculate_lead_score(pain_point_urgency: float, coldness_score: int, company_fit: int = 7, contact_quality: int = 5) -> float:
+    """Calculate total lead score based on the user's framework"""
+    return float(score_leads(
+        np.float64(pain_point_urgency),
+        np.float64(coldness_score),
+        np.float64(company_fit),
+        np.float64(contact_quality)
+    ))
+
+def lead_tier(total_score: float) -> str:
+    """Bucket a total lead score into its hot/warm/cold tier"""
+    if total_score >= 8:
+        return "hot"
+    if total_score >= 5:
+        return "warm"
+    return "cold"
+
+async def rescore_lead_batch(leads: List[dict]) -> int:
+    """Rescore a batch of analyzed leads and write the scores that changed in one bulk_write; returns how many changed"""
+    pain_point_urgency = np.array([
+        np.mean([pp["urgency"] for pp in lead["pain_points"]]) if lead.get("pain_points") else 3
+        for lead in leads
+    ], dtype=np.float64)
+    coldness_score = np.array([lead.get("coldness_score") or 5 for lead in leads], dtype=np.float64)
+    contact_quality = np.array([lead.get("contact_info_quality") or 5 for lead in leads], dtype=np.float64)
+    total_scores = score_leads(pain_point_urgency, coldness_score, np.full(len(leads), 7.0), contact_quality)
+    
+    # Leads whose score and tier already match are left alone, so their updated_at is not bumped
+    changed = [
+        (lead, float(score), lead_tier(score))
+        for lead, score in zip(leads, total_scores)
+        if (float(score), lead_tier(score)) != (lead.get("total_lead_score"), lead.get("lead_tier"))
+    ]
+    if not changed:
+        return 0
+    
+    now = utc_now()
+    await db.leads.bulk_write([
+        UpdateOne({"id": lead["id"]}, {"$set": {
+            "total_lead_score": score,
+            "lead_tier": tier,
+            "updated_at": now
+        }})
+        for lead, score, tier in changed
+    ], ordered=False)
+    for lead, _, _ in changed:
+        _get_lead_cached.cache_invalidate(lead["id"])
+    return len(changed)
 
 # API Routes
 @api_router.get("/")
@@ -187,83 +502,256 @@ async def root():
 @api_router.post("/leads", response_model=Lead)
 async def create_lead(lead_data: LeadCreate):
     """Create a new lead and start analysis"""
-    lead_dict = lead_data.dict()
-    lead_obj = Lead(**lead_dict)
+    now = utc_now()
+    lead_obj = Lead(**lead_data.model_dump(), created_at=now, updated_at=now)
     
     # Insert into database
-    await db.leads.insert_one(lead_obj.dict())
+    await db.leads.insert_one(lead_obj.model_dump())
+    _get_lead_cached.cache_invalidate(lead_obj.id)
     
-    # Start background analysis if content provided
+    # Queue analysis if content provided
     if lead_data.manual_content:
-        asyncio.create_task(analyze_lead_background(lead_obj.id, lead_data.manual_content, lead_obj.dict()))
+        await enqueue_analysis(lead_obj.id, lead_data.manual_content, not lead_data.no_cache)
     
     return lead_obj
 
-async def analyze_lead_background(lead_id: str, content: str, lead_data: dict):
-    """Background task to analyze lead"""
+@api_router.post("/leads/bulk", response_model=List[Lead])
+async def bulk_create_leads(leads_data: List[LeadCreate]):
+    """Create many leads at once and analyze them concurrently"""
+    now = utc_now()
+    lead_objs = [Lead(**lead_data.model_dump(), created_at=now, updated_at=now) for lead_data in leads_data]
+    if not lead_objs:
+        return []
+    
+    lead_docs = [lead_obj.model_dump() for lead_obj in lead_objs]
+    await db.leads.insert_many(lead_docs, ordered=False)
+    for lead_obj in lead_objs:
+        _get_lead_cached.cache_invalidate(lead_obj.id)
+    
+    # Queue analyses; the worker pool processes them concurrently
+    jobs = [
+        _analysis_job(lead_obj.id, lead_data.manual_content, not lead_data.no_cache)
+        for lead_obj, lead_data in zip(lead_objs, leads_data)
+        if lead_data.manual_content
+    ]
+    if jobs:
+        await db.analysis_jobs.insert_many(jobs)
+        _job_available.set()
+    
+    return lead_objs
+
+async def analyze_lead(lead_id: str, content: str, lead_data: dict, use_cache: bool = True):
+    """Analyze a lead and store the results; raises if the analysis fails"""
+    # Update status to analyzing
+    await queue_lead_update(lead_id, {"analysis_status": "analyzing", "updated_at": utc_now()})
+    
+    # Perform analysis
+    analysis = await analyze_with_gpt4(content, lead_data, use_cache)
+    
+    # Convert pain points
+    pain_points = []
+    for pp in analysis.get("pain_points", []):
+        pain_points.append(PainPoint(**pp))
+    
+    # Calculate average urgency
+    avg_urgency = sum(pp.urgency for pp in pain_points) / len(pain_points) if pain_points else 3
+    
+    # Calculate total score
+    coldness_score = analysis.get("coldness_score", 5)
+    total_score = calculate_lead_score(avg_urgency, coldness_score)
+    
+    # Update lead with analysis results
+    update_data = {
+        "pain_points": [pp.model_dump() for pp in pain_points],
+        "coldness_score": coldness_score,
+        "total_lead_score": total_score,
+        "lead_tier": lead_tier(total_score),
+        "best_outreach_angle": analysis.get("best_outreach_angle", ""),
+        "recent_activity_summary": analysis.get("coldness_factors", {}).get("recent_activity", ""),
+        "analysis_status": "completed",
+        "updated_at": utc_now()
+    }
+    
+    # Wait until the results are stored, so the job is only marked done once they are durable
+    await (await queue_lead_update(lead_id, update_data))
+
+def _analysis_job(lead_id: str, content: str, use_cache: bool) -> dict:
+    """Build a queued analysis job document"""
+    now = utc_now()
+    return {
+        "lead_id": lead_id,
+        "content": content,
+        "use_cache": use_cache,
+        "status": "queued",
+        "attempts": 0,
+        "available_at": now,
+        "created_at": now
+    }
+
+async def enqueue_analysis(lead_id: str, content: str, use_cache: bool = True):
+    """Persist an analysis job so it survives restarts, and wake a worker"""
+    await db.analysis_jobs.insert_one(_analysis_job(lead_id, content, use_cache))
+    _job_available.set()
+
+async def claim_analysis_job() -> Optional[dict]:
+    """Atomically claim the next due job, including jobs whose worker died mid-run"""
+    now = utc_now()
+    return await db.analysis_jobs.find_one_and_update(
+        {"$or": [
+            {"status": "queued", "available_at": {"$lte": now}},
+            {"status": "running", "lease_expires_at": {"$lte": now}}
+        ]},
+        {
+            "$set": {"status": "running", "lease_expires_at": now + timedelta(seconds=JOB_LEASE_SECONDS)},
+            "$inc": {"attempts": 1}
+        },
+        sort=[("available_at", ASCENDING)],
+        return_document=ReturnDocument.AFTER
+    )
+
+async def finish_analysis_job(job: dict, status: str, error: Optional[str] = None):
+    """Mark a job finished; finished jobs expire after JOB_RETENTION_SECONDS"""
+    await db.analysis_jobs.update_one(
+        {"_id": job["_id"]},
+        {"$set": {"status": status, "error": error, "finished_at": utc_now()}}
+    )
+
+async def run_analysis_job(job: dict):
+    """Run one claimed job, retrying with exponential backoff on failure"""
+    lead_id = job["lead_id"]
+    lead = await db.leads.find_one({"id": lead_id})
+    if not lead:
+        # Lead was deleted while the job was queued
+        await finish_analysis_job(job, "cancelled")
+        return
+    
     try:
-        # Update status to analyzing
-        await db.leads.update_one(
-            {"id": lead_id},
-            {"$set": {"analysis_status": "analyzing", "updated_at": datetime.utcnow()}}
-        )
-        
-        # Perform analysis
-        analysis = await analyze_with_gpt4(content, lead_data)
-        
-        # Convert pain points
-        pain_points = []
-        for pp in analysis.get("pain_points", []):
-            pain_points.append(PainPoint(**pp))
-        
-        # Calculate average urgency
-        avg_urgency = sum(pp.urgency for pp in pain_points) / len(pain_points) if pain_points else 3
-        
-        # Calculate total score
-        coldness_score = analysis.get("coldness_score", 5)
-        total_score = calculate_lead_score(avg_urgency, coldness_score)
-        
-        # Update lead with analysis results
-        update_data = {
-            "pain_points": [pp.dict() for pp in pain_points],
-            "coldness_score": coldness_score,
-            "total_lead_score": total_score,
-            "best_outreach_angle": analysis.get("best_outreach_angle", ""),
-            "recent_activity_summary": analysis.get("coldness_factors", {}).get("recent_activity", ""),
-            "analysis_status": "completed",
-            "updated_at": datetime.utcnow()
-        }
-        
-        await db.leads.update_one({"id": lead_id}, {"$set": update_data})
-        
+        # A retry asks the model again rather than replaying whatever the failed attempt was served from the cache
+        await analyze_lead(lead_id, job["content"], lead, job["use_cache"] and job["attempts"] == 1)
     except Exception as e:
+        if job["attempts"] < JOB_MAX_ATTEMPTS:
+            logging.warning(f"Analysis attempt {job['attempts']} failed for lead {lead_id}, retrying: {str(e)}")
+            await db.analysis_jobs.update_one(
+                {"_id": job["_id"]},
+                {"$set": {
+                    "status": "queued",
+                    "error": str(e),
+                    "available_at": utc_now() + timedelta(seconds=JOB_RETRY_BASE_SECONDS * 2 ** (job["attempts"] - 1))
+                }}
+            )
+            return
+        
         logging.error(f"Analysis failed for lead {lead_id}: {str(e)}")
-        await db.leads.update_one(
-            {"id": lead_id},
-            {"$set": {"analysis_status": "failed", "updated_at": datetime.utcnow()}}
-        )
+        await (await queue_lead_update(lead_id, {"analysis_status": "failed", "updated_at": utc_now()}))
+        await finish_analysis_job(job, "failed", str(e))
+        return
+    
+    await finish_analysis_job(job, "done")
 
-@api_router.get("/leads", response_model=List[Lead])
-async def get_leads():
-    """Get all leads"""
-    leads = await db.leads.find().sort("created_at", -1).to_list(1000)
-    return [Lead(**lead) for lead in leads]
+async def analysis_worker():
+    """Process queued analysis jobs until cancelled"""
+    while True:
+        try:
+            _job_available.clear()
+            job = await claim_analysis_job()
+            if job is None:
+                # Sleep until a job is enqueued here, or poll for retries and other processes' jobs
+                try:
+                    await asyncio.wait_for(_job_available.wait(), JOB_POLL_INTERVAL)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+            await run_analysis_job(job)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            logging.error(f"Analysis worker error: {str(e)}")
+            await asyncio.sleep(JOB_POLL_INTERVAL)
+
+@api_router.get("/leads", response_model=List[LeadSummary])
+async def get_leads(limit: int = Query(0, ge=0), cursor: Optional[str] = None):
+    """Get leads newest first, all of them by default; pass limit to page, with the id of the last lead received as cursor"""
+    query = {}
+    if cursor:
+        last_lead = await db.leads.find_one({"id": cursor}, {"_id": 1})
+        if not last_lead:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query["_id"] = {"$lt": last_lead["_id"]}
+    
+    # Stream rows as they arrive instead of materializing the whole page
+    async def stream_leads():
+        yield b"["
+        first = True
+        async for lead in db.leads.find(query, LEAD_LIST_PROJECTION).sort("_id", -1).limit(limit):
+            if not first:
+                yield b","
+            yield orjson.dumps(lead)
+            first = False
+        yield b"]"
+    
+    return StreamingResponse(stream_leads(), media_type="application/json")
 
 @api_router.get("/leads/{lead_id}", response_model=Lead)
-async def get_lead(lead_id: str):
-    """Get specific lead"""
-    lead = await db.leads.find_one({"id": lead_id})
+async def get_lead(
+    lead_id: str,
+    wait: Optional[str] = None,
+    timeout: float = Query(30, ge=0, le=LEAD_STREAM_TIMEOUT),
+    if_none_match: Optional[str] = Header(None)
+):
+    """Get specific lead; pollers can send If-None-Match to get an empty 304 while it is unchanged"""
+    lead = await read_lead(lead_id)
+    
+    # Long-poll: with ?wait=<status>[,<status>] hold the request until the lead reaches one of them,
+    # its analysis ends, or timeout seconds pass
+    if wait and lead:
+        targets = {*wait.split(","), *ANALYSIS_DONE_STATUSES}
+        deadline = asyncio.get_running_loop().time() + timeout
+        while lead and lead.analysis_status not in targets and asyncio.get_running_loop().time() < deadline:
+            await asyncio.sleep(LEAD_STREAM_POLL_INTERVAL)
+            lead = await read_lead(lead_id)
+    
     if not lead:
         raise HTTPException(status_code=404, detail="Lead not found")
-    return Lead(**lead)
+    
+    body = orjson.dumps(lead.model_dump())
+    headers = {
+        "ETag": f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"',
+        "X-Analysis-Status": lead.analysis_status
+    }
+    if if_none_match and headers["ETag"] in (tag.strip() for tag in if_none_match.split(",")):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
+
+@api_router.get("/leads/{lead_id}/stream")
+async def stream_lead(lead_id: str):
+    """Stream the lead as server-sent events each time its analysis_status changes, ending once analysis is done"""
+    lead = await read_lead(lead_id)
+    if not lead:
+        raise HTTPException(status_code=404, detail="Lead not found")
+    
+    async def lead_events(lead: Optional[Lead]):
+        deadline = asyncio.get_running_loop().time() + LEAD_STREAM_TIMEOUT
+        last_status = None
+        # Writers invalidate the lead cache, or it is off, so each re-read sees the latest status
+        while lead:
+            if lead.analysis_status != last_status:
+                last_status = lead.analysis_status
+                yield b"data: " + orjson.dumps(lead.model_dump()) + b"\n\n"
+            if last_status in ANALYSIS_DONE_STATUSES or asyncio.get_running_loop().time() >= deadline:
+                return
+            await asyncio.sleep(LEAD_STREAM_POLL_INTERVAL)
+            lead = await read_lead(lead_id)
+    
+    return StreamingResponse(lead_events(lead), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
 
 @api_router.put("/leads/{lead_id}", response_model=Lead)
 async def update_lead(lead_id: str, lead_data: LeadCreate):
     """Update lead information"""
-    update_data = lead_data.dict()
-    update_data["updated_at"] = datetime.utcnow()
+    update_data = lead_data.model_dump(exclude={"no_cache"})
+    update_data["updated_at"] = utc_now()
     
     result = await db.leads.update_one({"id": lead_id}, {"$set": update_data})
+    _get_lead_cached.cache_invalidate(lead_id)
     if result.matched_count == 0:
         raise HTTPException(status_code=404, detail="Lead not found")
     
@@ -274,35 +762,59 @@ async def update_lead(lead_id: str, lead_data: LeadCreate):
 async def delete_lead(lead_id: str):
     """Delete a lead"""
     result = await db.leads.delete_one({"id": lead_id})
+    _get_lead_cached.cache_invalidate(lead_id)
     if result.deleted_count == 0:
         raise HTTPException(status_code=404, detail="Lead not found")
     return {"message": "Lead deleted successfully"}
 
 @api_router.post("/leads/{lead_id}/analyze")
-async def trigger_analysis(lead_id: str, content: str):
+async def trigger_analysis(lead_id: str, content: str, no_cache: bool = False):
     """Manually trigger analysis for a lead"""
-    lead = await db.leads.find_one({"id": lead_id})
-    if not lead:
+    if not await db.leads.find_one({"id": lead_id}, {"_id": 1}):
         raise HTTPException(status_code=404, detail="Lead not found")
     
-    # Start background analysis
-    asyncio.create_task(analyze_lead_background(lead_id, content, lead))
+    # Queue analysis
+    await enqueue_analysis(lead_id, content, not no_cache)
     
     return {"message": "Analysis started"}
 
+@api_router.post("/leads/rescore")
+async def rescore_leads(lead_id: Optional[List[str]] = Query(None)):
+    """Recompute the total score of every analyzed lead, or only of the given lead_id(s); reports how many changed"""
+    query = {"analysis_status": "completed"}
+    if lead_id:
+        query["id"] = {"$in": lead_id}
+    
+    rescored = 0
+    batch = []
+    cursor = db.leads.find(
+        query,
+        {"_id": 0, "id": 1, "pain_points.urgency": 1, "coldness_score": 1, "contact_info_quality": 1, "total_lead_score": 1, "lead_tier": 1}
+    )
+    async for lead in cursor:
+        batch.append(lead)
+        if len(batch) >= RESCORE_BATCH_SIZE:
+            rescored += await rescore_lead_batch(batch)
+            batch = []
+    if batch:
+        rescored += await rescore_lead_batch(batch)
+    
+    return {"message": "Leads rescored successfully", "rescored": rescored}
+
 @api_router.get("/leads/stats/summary")
 async def get_lead_stats():
     """Get lead statistics"""
-    total_leads = await db.leads.count_documents({})
-    hot_leads = await db.leads.count_documents({"total_lead_score": {"$gte": 8}})
-    warm_leads = await db.leads.count_documents({"total_lead_score": {"$gte": 5, "$lt": 8}})
-    cold_leads = await db.leads.count_documents({"total_lead_score": {"$lt": 5}})
+    # Tiers are written with the score, so one $group over the indexed tier counts every bucket
+    tier_counts = {}
+    cursor = await db.leads.aggregate([{"$group": {"_id": "$lead_tier", "n": {"$sum": 1}}}])
+    async for group in cursor:
+        tier_counts[group["_id"]] = group["n"]
     
     return {
-        "total_leads": total_leads,
-        "hot_leads": hot_leads,
-        "warm_leads": warm_leads,
-        "cold_leads": cold_leads
+        "total_leads": sum(tier_counts.values()),
+        "hot_leads": tier_counts.get("hot", 0),
+        "warm_leads": tier_counts.get("warm", 0),
+        "cold_leads": tier_counts.get("cold", 0)
     }
 
 # Include the router in the main app
@@ -323,6 +835,53 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@app.on_event("startup")
+async def start_lead_update_flusher():
+    global _flusher_task
+    _flusher_task = asyncio.create_task(lead_update_flusher())
+
+@app.on_event("startup")
+async def start_analysis_workers():
+    for _ in range(ANALYSIS_WORKERS):
+        _job_workers.append(asyncio.create_task(analysis_worker()))
+
+@app.on_event("startup")
+async def create_db_indexes():
+    await db.leads.create_indexes([
+        IndexModel([("id", ASCENDING)], unique=True),
+        IndexModel([("total_lead_score", ASCENDING)]),
+        IndexModel([("lead_tier", ASCENDING)]),
+        IndexModel([("analysis_status", ASCENDING)])
+    ])
+    
+    # Expire cached analyses so they do not go stale indefinitely
+    await db.lead_analysis_cache.create_index("created_at", expireAfterSeconds=ANALYSIS_CACHE_TTL_SECONDS)
+    await db.lead_analysis_cache.create_index([("industry", 1), ("created_at", -1)])
+    await db.llm_exact_cache.create_index("created_at", expireAfterSeconds=ANALYSIS_CACHE_TTL_SECONDS)
+    await db.analysis_jobs.create_index([("status", ASCENDING), ("available_at", ASCENDING)])
+    await db.analysis_jobs.create_index([("status", ASCENDING), ("lease_expires_at", ASCENDING)])
+    await db.analysis_jobs.create_index("finished_at", expireAfterSeconds=JOB_RETENTION_SECONDS)
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
-    client.close()
\ No newline at end of file
+    # Running jobs are reclaimed by the next process once their lease expires
+    for worker in _job_workers:
+        worker.cancel()
+    if _flusher_task:
+        _flusher_task.cancel()
+    await flush_lead_updates()
+    await client.close()
+    await _openai_http.aclose()
+
+if __name__ == "__main__":
+    import uvicorn
+    
+    # C-accelerated event loop and HTTP parser
+    uvicorn.run(
+        "server:app",
+        host="0.0.0.0",
+        port=int(os.environ.get('PORT', '8001')),
+        loop="uvloop",
+        http="httptools",
+        workers=WEB_CONCURRENCY
+    )
@@ -4,57 +4,231 @@ Comprehensive Backend API Testing for Lead Generation System
 Tests all API endpoints with realistic business data
 """
 
-import requests
-import json
+import asyncio
+import collections
+import contextvars
+import fastjsonschema
+import functools
+import itertools
+import logging
+import logging.handlers
+import orjson
+import queue
 import time
 import uuid
 from datetime import datetime
 import os
+import sys
 from dotenv import load_dotenv
+from http_client import JSON_HEADERS, close_client, get_client, json_body
 
-# Load environment variables
-load_dotenv('/app/frontend/.env')
+# Load environment variables, unless the caller already exported the backend URL
+if 'REACT_APP_BACKEND_URL' not in os.environ:
+    load_dotenv('/app/frontend/.env')
 
 # Get backend URL from environment
 BACKEND_URL = os.getenv('REACT_APP_BACKEND_URL', 'https://c84c520d-1762-489e-bb0d-6c5ed7a967cd.preview.emergentagent.com')
 API_BASE_URL = f"{BACKEND_URL}/api"
 
-print(f"Testing backend API at: {API_BASE_URL}")
+# Test output is queued and written by a listener thread, off the path of the tests themselves
+_log_queue = queue.SimpleQueue()
+logger = logging.getLogger("backend_test")
+logger.setLevel(logging.INFO)
+logger.propagate = False
+logger.addHandler(logging.handlers.QueueHandler(_log_queue))
+_log_listener = logging.handlers.QueueListener(_log_queue, logging.StreamHandler(sys.stdout))
+
+# Records logged by the test running in this task, passed on in one piece when it ends
+_test_records = contextvars.ContextVar("test_records", default=None)
+
+class _BufferPerTest(logging.Filter):
+    """Hold back records logged inside a running test, so concurrently running tests do not interleave"""
+    
+    def filter(self, record):
+        records = _test_records.get()
+        if records is None:
+            return True
+        records.append(record)
+        return False
+
+logger.addFilter(_BufferPerTest())
+
+# Request bodies are built and serialized once rather than per run
+_BASIC_LEAD = {
+    "company_name": "TechCorp Solutions",
+    "industry": "Software Development",
+    "company_size": "50-200 employees",
+    "decision_maker_name": "Sarah Johnson",
+    "decision_maker_title": "CTO",
+    "linkedin_url": "https://linkedin.com/in/sarah-johnson-cto"
+}
+_BASIC_LEAD_BODY = orjson.dumps(_BASIC_LEAD)
+
+# Realistic business content for AI analysis
+_AI_MANUAL_CONTENT = """
+            TechCorp Solutions is a mid-sized software development company struggling with several operational challenges:
+            
+            Recent LinkedIn posts from their CTO Sarah Johnson indicate:
+            - "Our development team is spending 40% of their time on manual testing processes"
+            - "We're looking to scale our DevOps practices but lack the right automation tools"
+            - "Client delivery timelines are being impacted by our current CI/CD pipeline limitations"
+            
+            Company announcements show:
+            - Recently secured $2M Series A funding for expansion
+            - Planning to double their engineering team in the next 6 months
+            - Struggling with code quality consistency across multiple projects
+            - Looking to implement better project management and collaboration tools
+            
+            Pain points identified:
+            1. Manual testing processes causing delays
+            2. Inadequate DevOps automation
+            3. CI/CD pipeline bottlenecks
+            4. Code quality inconsistencies
+            5. Need for better project management tools
+            6. Scaling challenges with rapid team growth
+            
+            The company appears to be in a growth phase with immediate needs for development tooling and process automation.
+            """
+
+_AI_LEAD = {
+    "company_name": "InnovateTech Industries",
+    "industry": "Technology Services",
+    "company_size": "100-500 employees",
+    "decision_maker_name": "Michael Chen",
+    "decision_maker_title": "VP of Engineering",
+    "linkedin_url": "https://linkedin.com/in/michael-chen-vp-eng",
+    "manual_content": _AI_MANUAL_CONTENT
+}
+_AI_LEAD_BODY = orjson.dumps(_AI_LEAD)
+
+# Leads without manual content, so bulk creation does not queue any analyses
+_BULK_LEADS = [
+    {"company_name": "Northwind Logistics", "industry": "Logistics", "decision_maker_name": "Priya Patel", "decision_maker_title": "COO"},
+    {"company_name": "Blue Harbor Health", "industry": "Healthcare", "decision_maker_name": "Daniel Okafor", "decision_maker_title": "CIO"}
+]
+_BULK_LEADS_BODY = orjson.dumps(_BULK_LEADS)
+
+# Response shape checks, compiled once
+_LEAD_SHAPE = {
+    "type": "object",
+    "required": ["id", "company_name"],
+    "properties": {"id": {"type": "string"}, "company_name": {"type": "string"}}
+}
+LEAD_SCHEMA = fastjsonschema.compile(_LEAD_SHAPE)
+LEAD_LIST_SCHEMA = fastjsonschema.compile({"type": "array", "items": _LEAD_SHAPE})
+RESCORE_SCHEMA = fastjsonschema.compile({
+    "type": "object",
+    "required": ["rescored"],
+    "properties": {"rescored": {"type": "integer"}}
+})
+STATS_SCHEMA = fastjsonschema.compile({
+    "type": "object",
+    "required": ["total_leads", "hot_leads", "warm_leads", "cold_leads"],
+    "properties": {field: {"type": "integer"} for field in ["total_leads", "hot_leads", "warm_leads", "cold_leads"]}
+})
+
+def _matches(validator, data):
+    """Return whether data passes a compiled schema validator"""
+    try:
+        validator(data)
+        return True
+    except fastjsonschema.JsonSchemaException:
+        return False
 
 class LeadGenerationAPITester:
+    ENDPOINTS = {
+        "root": "/",
+        "leads": "/leads",
+        "lead": "/leads/{id}",
+        "bulk": "/leads/bulk",
+        "rescore": "/leads/rescore",
+        "stats": "/leads/stats/summary"
+    }
+    
     def __init__(self):
-        self.session = requests.Session()
+        self._get_cache = {}
         self.test_lead_id = None
+        # Random ids that are never created, drawn once and reused by repeated 404 checks
+        self._fake_ids = itertools.cycle(tuple(str(uuid.uuid4()) for _ in range(32)))
         self.test_results = {
             'passed': 0,
             'failed': 0,
-            'errors': []
+            'skipped': 0,
+            'errors': collections.deque(maxlen=256)  # Bounded for long soak runs
         }
     
+    @property
+    def session(self):
+        """The shared client of the event loop the tests are running on"""
+        return get_client()
+    
     def log_result(self, test_name, success, message="", response=None):
         """Log test results"""
         status = "✅ PASS" if success else "❌ FAIL"
-        print(f"{status}: {test_name}")
+        logger.info(f"{status}: {test_name}")
         if message:
-            print(f"   {message}")
+            logger.info(f"   {message}")
         if response and not success:
-            print(f"   Response: {response.status_code} - {response.text[:200]}")
+            logger.info(f"   Response: {response.status_code} - {response.text[:200]}")
         
         if success:
             self.test_results['passed'] += 1
         else:
             self.test_results['failed'] += 1
             self.test_results['errors'].append(f"{test_name}: {message}")
-        print()
+        logger.info("")
+    
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def _url(name, **params):
+        """Build the full URL of a named endpoint, memoized per (name, params)"""
+        return API_BASE_URL + LeadGenerationAPITester.ENDPOINTS[name].format(**params)
+    
+    async def _req(self, method, url, **kwargs):
+        """Send a request to the API; the shared client applies its default timeout"""
+        if method != "GET":
+            # Any write can change what the cached reads return
+            self._get_cache.clear()
+        return await self.session.request(method, url, **kwargs)
+    
+    async def _cached_get(self, url, ttl=5.0):
+        """GET an idempotent endpoint, reusing a response fetched within the last ttl seconds"""
+        cached = self._get_cache.get(url)
+        if cached and time.monotonic() - cached[0] < ttl:
+            return cached[1]
+        response = await self._req("GET", url)
+        self._get_cache[url] = (time.monotonic(), response)
+        return response
+    
+    async def _wait_for_status(self, lead_id, targets, timeout=15, base=0.25, cap=2.0):
+        """Poll a lead with exponential backoff until its analysis_status is one of targets"""
+        deadline = time.monotonic() + timeout
+        attempt = 0
+        data = None
+        etag = None
+        while time.monotonic() < deadline:
+            # Conditional GET: an unchanged lead comes back as an empty 304
+            headers = {"If-None-Match": etag} if etag else {}
+            response = await self._req("GET", self._url("lead", id=lead_id), headers=headers)
+            if response.status_code == 200:
+                data = json_body(response)
+                etag = response.headers.get("ETag")
+            elif response.status_code == 304 and data is not None:
+                data['analysis_status'] = response.headers.get("X-Analysis-Status", data.get('analysis_status'))
+            if data and data.get('analysis_status') in targets:
+                return data
+            await asyncio.sleep(min(cap, base * 2 ** attempt, max(0.0, deadline - time.monotonic())))
+            attempt += 1
+        return None
     
-    def test_api_health_check(self):
+    async def test_api_health_check(self):
         """Test 1: Basic API Health Check"""
-        print("=== Test 1: API Health Check ===")
+        logger.info("=== Test 1: API Health Check ===")
         try:
-            response = self.session.get(f"{API_BASE_URL}/")
+            response = await self._cached_get(self._url("root"))
             
             if response.status_code == 200:
-                data = response.json()
+                data = json_body(response)
                 if "message" in data and "Lead Generation System API" in data["message"]:
                     self.log_result("API Health Check", True, f"API is running: {data['message']}")
                     return True
@@ -66,24 +240,15 @@ class LeadGenerationAPITester:
             self.log_result("API Health Check", False, f"Connection error: {str(e)}")
         return False
     
-    def test_create_lead_basic(self):
+    async def test_create_lead_basic(self):
         """Test 2: Create Lead - Basic Data"""
-        print("=== Test 2: Create Lead (Basic) ===")
+        logger.info("=== Test 2: Create Lead (Basic) ===")
         try:
-            lead_data = {
-                "company_name": "TechCorp Solutions",
-                "industry": "Software Development",
-                "company_size": "50-200 employees",
-                "decision_maker_name": "Sarah Johnson",
-                "decision_maker_title": "CTO",
-                "linkedin_url": "https://linkedin.com/in/sarah-johnson-cto"
-            }
-            
-            response = self.session.post(f"{API_BASE_URL}/leads", json=lead_data)
+            response = await self._req("POST", self._url("leads"), content=_BASIC_LEAD_BODY, headers=JSON_HEADERS)
             
             if response.status_code == 200:
-                data = response.json()
-                if "id" in data and data["company_name"] == lead_data["company_name"]:
+                data = json_body(response)
+                if _matches(LEAD_SCHEMA, data) and data["company_name"] == _BASIC_LEAD["company_name"]:
                     self.test_lead_id = data["id"]
                     self.log_result("Create Lead (Basic)", True, f"Lead created with ID: {self.test_lead_id}")
                     return True
@@ -95,79 +260,34 @@ class LeadGenerationAPITester:
             self.log_result("Create Lead (Basic)", False, f"Error: {str(e)}")
         return False
     
-    def test_create_lead_with_ai_analysis(self):
+    async def test_create_lead_with_ai_analysis(self):
         """Test 3: Create Lead with AI Analysis Content"""
-        print("=== Test 3: Create Lead with AI Analysis ===")
+        logger.info("=== Test 3: Create Lead with AI Analysis ===")
         try:
-            # Realistic business content for AI analysis
-            manual_content = """
-            TechCorp Solutions is a mid-sized software development company struggling with several operational challenges:
-            
-            Recent LinkedIn posts from their CTO Sarah Johnson indicate:
-            - "Our development team is spending 40% of their time on manual testing processes"
-            - "We're looking to scale our DevOps practices but lack the right automation tools"
-            - "Client delivery timelines are being impacted by our current CI/CD pipeline limitations"
-            
-            Company announcements show:
-            - Recently secured $2M Series A funding for expansion
-            - Planning to double their engineering team in the next 6 months
-            - Struggling with code quality consistency across multiple projects
-            - Looking to implement better project management and collaboration tools
-            
-            Pain points identified:
-            1. Manual testing processes causing delays
-            2. Inadequate DevOps automation
-            3. CI/CD pipeline bottlenecks
-            4. Code quality inconsistencies
-            5. Need for better project management tools
-            6. Scaling challenges with rapid team growth
-            
-            The company appears to be in a growth phase with immediate needs for development tooling and process automation.
-            """
-            
-            lead_data = {
-                "company_name": "InnovateTech Industries",
-                "industry": "Technology Services",
-                "company_size": "100-500 employees",
-                "decision_maker_name": "Michael Chen",
-                "decision_maker_title": "VP of Engineering",
-                "linkedin_url": "https://linkedin.com/in/michael-chen-vp-eng",
-                "manual_content": manual_content
-            }
-            
-            response = self.session.post(f"{API_BASE_URL}/leads", json=lead_data)
+            response = await self._req("POST", self._url("leads"), content=_AI_LEAD_BODY, headers=JSON_HEADERS)
             
             if response.status_code == 200:
-                data = response.json()
-                if "id" in data and data["company_name"] == lead_data["company_name"]:
+                data = json_body(response)
+                if _matches(LEAD_SCHEMA, data) and data["company_name"] == _AI_LEAD["company_name"]:
                     ai_lead_id = data["id"]
                     self.log_result("Create Lead with AI Analysis", True, 
                                   f"Lead created with AI analysis trigger. ID: {ai_lead_id}, Status: {data.get('analysis_status', 'unknown')}")
                     
-                    # Wait a moment and check if analysis started
-                    time.sleep(2)
-                    check_response = self.session.get(f"{API_BASE_URL}/leads/{ai_lead_id}")
-                    if check_response.status_code == 200:
-                        check_data = check_response.json()
-                        analysis_status = check_data.get('analysis_status', 'unknown')
-                        print(f"   Analysis status after 2s: {analysis_status}")
-                        
-                        # Wait longer for analysis to complete
-                        if analysis_status == "analyzing":
-                            print("   Waiting for AI analysis to complete...")
-                            time.sleep(10)
-                            final_check = self.session.get(f"{API_BASE_URL}/leads/{ai_lead_id}")
-                            if final_check.status_code == 200:
-                                final_data = final_check.json()
-                                final_status = final_data.get('analysis_status', 'unknown')
-                                print(f"   Final analysis status: {final_status}")
-                                if final_status == "completed":
-                                    pain_points = final_data.get('pain_points', [])
-                                    coldness_score = final_data.get('coldness_score')
-                                    total_score = final_data.get('total_lead_score')
-                                    print(f"   Pain points found: {len(pain_points)}")
-                                    print(f"   Coldness score: {coldness_score}")
-                                    print(f"   Total lead score: {total_score}")
+                    # Poll with backoff until the analysis finishes instead of sleeping a fixed time
+                    logger.info("   Waiting for AI analysis to complete...")
+                    final_data = await self._wait_for_status(ai_lead_id, ("completed", "failed"))
+                    if final_data:
+                        final_status = final_data.get('analysis_status', 'unknown')
+                        logger.info(f"   Final analysis status: {final_status}")
+                        if final_status == "completed":
+                            pain_points = final_data.get('pain_points', [])
+                            coldness_score = final_data.get('coldness_score')
+                            total_score = final_data.get('total_lead_score')
+                            logger.info(f"   Pain points found: {len(pain_points)}")
+                            logger.info(f"   Coldness score: {coldness_score}")
+                            logger.info(f"   Total lead score: {total_score}")
+                    else:
+                        logger.info("   Analysis did not finish before the timeout")
                     
                     return True
                 else:
@@ -178,38 +298,38 @@ class LeadGenerationAPITester:
             self.log_result("Create Lead with AI Analysis", False, f"Error: {str(e)}")
         return False
     
-    def test_get_all_leads(self):
+    async def test_get_all_leads(self):
         """Test 4: Get All Leads"""
-        print("=== Test 4: Get All Leads ===")
+        logger.info("=== Test 4: Get All Leads ===")
         try:
-            response = self.session.get(f"{API_BASE_URL}/leads")
+            response = await self._cached_get(self._url("leads"))
             
             if response.status_code == 200:
-                data = response.json()
-                if isinstance(data, list):
+                data = json_body(response)
+                if _matches(LEAD_LIST_SCHEMA, data):
                     self.log_result("Get All Leads", True, f"Retrieved {len(data)} leads")
                     return True
                 else:
-                    self.log_result("Get All Leads", False, "Response is not a list", response)
+                    self.log_result("Get All Leads", False, "Response is not a list of leads", response)
             else:
                 self.log_result("Get All Leads", False, f"HTTP {response.status_code}", response)
         except Exception as e:
             self.log_result("Get All Leads", False, f"Error: {str(e)}")
         return False
     
-    def test_get_specific_lead(self):
+    async def test_get_specific_lead(self):
         """Test 5: Get Specific Lead"""
-        print("=== Test 5: Get Specific Lead ===")
+        logger.info("=== Test 5: Get Specific Lead ===")
         if not self.test_lead_id:
             self.log_result("Get Specific Lead", False, "No test lead ID available")
             return False
         
         try:
-            response = self.session.get(f"{API_BASE_URL}/leads/{self.test_lead_id}")
+            response = await self._req("GET", self._url("lead", id=self.test_lead_id))
             
             if response.status_code == 200:
-                data = response.json()
-                if "id" in data and data["id"] == self.test_lead_id:
+                data = json_body(response)
+                if _matches(LEAD_SCHEMA, data) and data["id"] == self.test_lead_id:
                     self.log_result("Get Specific Lead", True, f"Retrieved lead: {data['company_name']}")
                     return True
                 else:
@@ -220,9 +340,9 @@ class LeadGenerationAPITester:
             self.log_result("Get Specific Lead", False, f"Error: {str(e)}")
         return False
     
-    def test_update_lead(self):
+    async def test_update_lead(self):
         """Test 6: Update Lead"""
-        print("=== Test 6: Update Lead ===")
+        logger.info("=== Test 6: Update Lead ===")
         if not self.test_lead_id:
             self.log_result("Update Lead", False, "No test lead ID available")
             return False
@@ -237,11 +357,11 @@ class LeadGenerationAPITester:
                 "linkedin_url": "https://linkedin.com/in/sarah-johnson-cto"
             }
             
-            response = self.session.put(f"{API_BASE_URL}/leads/{self.test_lead_id}", json=update_data)
+            response = await self._req("PUT", self._url("lead", id=self.test_lead_id), json=update_data)
             
             if response.status_code == 200:
-                data = response.json()
-                if data["company_name"] == update_data["company_name"]:
+                data = json_body(response)
+                if _matches(LEAD_SCHEMA, data) and data["company_name"] == update_data["company_name"]:
                     self.log_result("Update Lead", True, f"Lead updated: {data['company_name']}")
                     return True
                 else:
@@ -252,16 +372,15 @@ class LeadGenerationAPITester:
             self.log_result("Update Lead", False, f"Error: {str(e)}")
         return False
     
-    def test_lead_statistics(self):
+    async def test_lead_statistics(self):
         """Test 7: Lead Statistics"""
-        print("=== Test 7: Lead Statistics ===")
+        logger.info("=== Test 7: Lead Statistics ===")
         try:
-            response = self.session.get(f"{API_BASE_URL}/leads/stats/summary")
+            response = await self._cached_get(self._url("stats"))
             
             if response.status_code == 200:
-                data = response.json()
-                required_fields = ["total_leads", "hot_leads", "warm_leads", "cold_leads"]
-                if all(field in data for field in required_fields):
+                data = json_body(response)
+                if _matches(STATS_SCHEMA, data):
                     self.log_result("Lead Statistics", True, 
                                   f"Stats: Total={data['total_leads']}, Hot={data['hot_leads']}, Warm={data['warm_leads']}, Cold={data['cold_leads']}")
                     return True
@@ -273,9 +392,9 @@ class LeadGenerationAPITester:
             self.log_result("Lead Statistics", False, f"Error: {str(e)}")
         return False
     
-    def test_invalid_lead_data(self):
+    async def test_invalid_lead_data(self):
         """Test 8: Invalid Lead Data Validation"""
-        print("=== Test 8: Data Validation ===")
+        logger.info("=== Test 8: Data Validation ===")
         try:
             # Test with missing required field
             invalid_data = {
@@ -283,7 +402,7 @@ class LeadGenerationAPITester:
                 # Missing company_name
             }
             
-            response = self.session.post(f"{API_BASE_URL}/leads", json=invalid_data)
+            response = await self._req("POST", self._url("leads"), json=invalid_data)
             
             if response.status_code == 422:  # Validation error
                 self.log_result("Data Validation", True, "Properly rejected invalid data")
@@ -294,43 +413,44 @@ class LeadGenerationAPITester:
             self.log_result("Data Validation", False, f"Error: {str(e)}")
         return False
     
-    def test_nonexistent_lead(self):
+    async def test_nonexistent_lead(self):
         """Test 9: Access Non-existent Lead"""
-        print("=== Test 9: Non-existent Lead Access ===")
+        logger.info("=== Test 9: Non-existent Lead Access ===")
         try:
-            fake_id = str(uuid.uuid4())
-            response = self.session.get(f"{API_BASE_URL}/leads/{fake_id}")
-            
-            if response.status_code == 404:
-                self.log_result("Non-existent Lead Access", True, "Properly returned 404 for non-existent lead")
-                return True
-            else:
-                self.log_result("Non-existent Lead Access", False, f"Expected 404, got {response.status_code}", response)
+            fake_id = next(self._fake_ids)
+            # Only the status matters, so the body is never read (GET routes answer HEAD with 405)
+            async with self.session.stream("GET", self._url("lead", id=fake_id)) as response:
+                if response.status_code == 404:
+                    self.log_result("Non-existent Lead Access", True, "Properly returned 404 for non-existent lead")
+                    return True
+                else:
+                    await response.aread()
+                    self.log_result("Non-existent Lead Access", False, f"Expected 404, got {response.status_code}", response)
         except Exception as e:
             self.log_result("Non-existent Lead Access", False, f"Error: {str(e)}")
         return False
     
-    def test_delete_lead(self):
+    async def test_delete_lead(self):
         """Test 10: Delete Lead"""
-        print("=== Test 10: Delete Lead ===")
+        logger.info("=== Test 10: Delete Lead ===")
         if not self.test_lead_id:
             self.log_result("Delete Lead", False, "No test lead ID available")
             return False
         
         try:
-            response = self.session.delete(f"{API_BASE_URL}/leads/{self.test_lead_id}")
+            response = await self._req("DELETE", self._url("lead", id=self.test_lead_id))
             
             if response.status_code == 200:
-                data = response.json()
+                data = json_body(response)
                 if "message" in data and "deleted" in data["message"].lower():
                     self.log_result("Delete Lead", True, "Lead deleted successfully")
                     
                     # Verify deletion
-                    verify_response = self.session.get(f"{API_BASE_URL}/leads/{self.test_lead_id}")
+                    verify_response = await self._req("GET", self._url("lead", id=self.test_lead_id))
                     if verify_response.status_code == 404:
-                        print("   ✅ Deletion verified - lead no longer exists")
+                        logger.info("   ✅ Deletion verified - lead no longer exists")
                     else:
-                        print("   ⚠️  Warning: Lead still exists after deletion")
+                        logger.info("   ⚠️  Warning: Lead still exists after deletion")
                     
                     return True
                 else:
@@ -341,15 +461,96 @@ class LeadGenerationAPITester:
             self.log_result("Delete Lead", False, f"Error: {str(e)}")
         return False
     
-    def run_all_tests(self):
-        """Run all tests in sequence"""
-        print("🚀 Starting Lead Generation System Backend API Tests")
-        print("=" * 60)
+    async def test_bulk_create_leads(self):
+        """Test 11: Bulk Create Leads"""
+        logger.info("=== Test 11: Bulk Create Leads ===")
+        try:
+            response = await self._req("POST", self._url("bulk"), content=_BULK_LEADS_BODY, headers=JSON_HEADERS)
+            
+            if response.status_code == 200:
+                data = json_body(response)
+                if _matches(LEAD_LIST_SCHEMA, data) and [lead["company_name"] for lead in data] == [lead["company_name"] for lead in _BULK_LEADS]:
+                    lead_ids = [lead["id"] for lead in data]
+                    try:
+                        # Verify every lead was stored
+                        verify_responses = await asyncio.gather(*[self._req("GET", self._url("lead", id=lead_id)) for lead_id in lead_ids])
+                        missing = [lead_id for lead_id, verify_response in zip(lead_ids, verify_responses) if verify_response.status_code != 200]
+                    finally:
+                        await asyncio.gather(*[self._req("DELETE", self._url("lead", id=lead_id)) for lead_id in lead_ids])
+                    
+                    if not missing:
+                        self.log_result("Bulk Create Leads", True, f"Created and verified {len(lead_ids)} leads")
+                        return True
+                    else:
+                        self.log_result("Bulk Create Leads", False, f"Created leads not found: {', '.join(missing)}")
+                else:
+                    self.log_result("Bulk Create Leads", False, "Response does not match the submitted leads", response)
+            else:
+                self.log_result("Bulk Create Leads", False, f"HTTP {response.status_code}", response)
+        except Exception as e:
+            self.log_result("Bulk Create Leads", False, f"Error: {str(e)}")
+        return False
+    
+    async def test_rescore_leads(self):
+        """Test 12: Rescore Leads"""
+        logger.info("=== Test 12: Rescore Leads ===")
+        if not self.test_lead_id:
+            self.log_result("Rescore Leads", False, "No test lead ID available")
+            return False
         
-        # Test sequence
-        tests = [
-            self.test_api_health_check,
-            self.test_create_lead_basic,
+        try:
+            # Scoped to the suite's own lead, so a run never rewrites other leads on a shared backend
+            response = await self._req("POST", self._url("rescore"), params={"lead_id": self.test_lead_id})
+            
+            if response.status_code == 200:
+                data = json_body(response)
+                if _matches(RESCORE_SCHEMA, data):
+                    self.log_result("Rescore Leads", True, f"Rescored {data['rescored']} of the suite's leads")
+                    return True
+                else:
+                    self.log_result("Rescore Leads", False, "Missing rescored count", response)
+            else:
+                self.log_result("Rescore Leads", False, f"HTTP {response.status_code}", response)
+        except Exception as e:
+            self.log_result("Rescore Leads", False, f"Error: {str(e)}")
+        return False
+    
+    async def run_test(self, test):
+        """Run a single test, recording unexpected exceptions as failures and logging its output as one block"""
+        token = _test_records.set([])
+        try:
+            return await test()
+        except Exception as e:
+            logger.info(f"❌ CRITICAL ERROR in {test.__name__}: {str(e)}")
+            self.test_results['failed'] += 1
+            self.test_results['errors'].append(f"{test.__name__}: Critical error - {str(e)}")
+            return False
+        finally:
+            records = _test_records.get()
+            _test_records.reset(token)
+            for record in records:
+                logger.handle(record)
+    
+    async def run_all_tests(self):
+        """Run all tests, concurrently where they do not depend on each other"""
+        _log_listener.start()
+        try:
+            return await self._run_all_tests()
+        finally:
+            # Drains the queue, so every line is written before main prints the verdict
+            _log_listener.stop()
+    
+    async def _run_all_tests(self):
+        """Run the test phases and log the summary"""
+        logger.info(f"Testing backend API at: {API_BASE_URL}")
+        logger.info("🚀 Starting Lead Generation System Backend API Tests")
+        logger.info("=" * 60)
+        
+        # Tests run in dependency order: health check, setup, then independent tests concurrently, then teardown
+        setup_tests = [
+            self.test_create_lead_basic
+        ]
+        independent_tests = [
             self.test_get_all_leads,
             self.test_get_specific_lead,
             self.test_update_lead,
@@ -357,35 +558,54 @@ class LeadGenerationAPITester:
             self.test_lead_statistics,
             self.test_invalid_lead_data,
             self.test_nonexistent_lead,
+            self.test_bulk_create_leads,
+            self.test_rescore_leads
+        ]
+        teardown_tests = [
             self.test_delete_lead
         ]
         
-        for test in tests:
-            try:
-                test()
-            except Exception as e:
-                print(f"❌ CRITICAL ERROR in {test.__name__}: {str(e)}")
-                self.test_results['failed'] += 1
-                self.test_results['errors'].append(f"{test.__name__}: Critical error - {str(e)}")
+        if await self.run_test(self.test_api_health_check):
+            for test in setup_tests:
+                await self.run_test(test)
+            await asyncio.gather(*[self.run_test(test) for test in independent_tests])
+            for test in teardown_tests:
+                await self.run_test(test)
+        else:
+            # Every other test would just wait out its own timeout against an unreachable API
+            self.test_results['skipped'] = len(setup_tests) + len(independent_tests) + len(teardown_tests)
+            logger.info(f"⏭️  Skipping {self.test_results['skipped']} remaining tests: API health check failed")
         
         # Final results
-        print("=" * 60)
-        print("🏁 TEST RESULTS SUMMARY")
-        print("=" * 60)
-        print(f"✅ Passed: {self.test_results['passed']}")
-        print(f"❌ Failed: {self.test_results['failed']}")
-        print(f"📊 Success Rate: {(self.test_results['passed'] / (self.test_results['passed'] + self.test_results['failed']) * 100):.1f}%")
+        logger.info("=" * 60)
+        logger.info("🏁 TEST RESULTS SUMMARY")
+        logger.info("=" * 60)
+        passed, failed = self.test_results['passed'], self.test_results['failed']
+        total = passed + failed
+        rate = passed / total * 100 if total else 0.0  # Nothing ran: report 0% instead of dividing by zero
+        logger.info(f"✅ Passed: {passed}")
+        logger.info(f"❌ Failed: {failed}")
+        if self.test_results['skipped']:
+            logger.info(f"⏭️  Skipped: {self.test_results['skipped']}")
+        logger.info(f"📊 Success Rate: {rate:.1f}%")
         
         if self.test_results['errors']:
-            print("\n🔍 FAILED TESTS:")
+            logger.info("\n🔍 FAILED TESTS:")
             for error in self.test_results['errors']:
-                print(f"   • {error}")
+                logger.info(f"   • {error}")
         
         return self.test_results['failed'] == 0
 
+async def main(tester):
+    """Run the suite, then close the shared client on the same event loop (atexit cannot await)"""
+    try:
+        return await tester.run_all_tests()
+    finally:
+        await close_client()
+
 if __name__ == "__main__":
     tester = LeadGenerationAPITester()
-    success = tester.run_all_tests()
+    success = asyncio.run(main(tester))
     
     if success:
         print("\n🎉 All tests passed! Backend API is working correctly.")
@@ -0,0 +1,64 @@
+"""
+Shared HTTP client for the Lead Generation System test scripts
+One pooled HTTP/2 client per event loop, so every script and tester running on it reuses the same connections
+"""
+
+import asyncio
+import httpx
+import orjson
+import weakref
+from typing import Any
+
+# Connect/read timeouts so a stalled connection fails the test instead of hanging it
+DEFAULT_TIMEOUT = httpx.Timeout(10.0, connect=3.05)
+
+# For requests whose body is already-serialized JSON bytes
+JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Transient gateway errors on idempotent requests are retried with backoff, like urllib3's Retry
+RETRY_TOTAL = 3
+RETRY_BACKOFF = 0.2  # seconds, doubled per attempt
+RETRY_STATUSES = (502, 503, 504)
+RETRY_METHODS = ("GET", "HEAD", "PUT", "DELETE")  # Not POST: a retried create could duplicate the lead
+
+class RetryingTransport(httpx.AsyncHTTPTransport):
+    """HTTP transport that also retries idempotent requests answered with a transient gateway error"""
+
+    async def handle_async_request(self, request):
+        for attempt in range(RETRY_TOTAL):
+            response = await super().handle_async_request(request)
+            if request.method not in RETRY_METHODS or response.status_code not in RETRY_STATUSES:
+                return response
+            await response.aclose()
+            await asyncio.sleep(RETRY_BACKOFF * 2 ** attempt)
+        return await super().handle_async_request(request)
+
+def json_body(response: httpx.Response) -> Any:
+    """Decode a response body straight from bytes with orjson"""
+    return orjson.loads(response.content)
+
+# One client per event loop, since a client's pooled connections belong to the loop that opened them
+_CLIENTS: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = weakref.WeakKeyDictionary()
+
+def get_client() -> httpx.AsyncClient:
+    """Return the running event loop's shared client, creating it on first use"""
+    loop = asyncio.get_running_loop()
+    client = _CLIENTS.get(loop)
+    if client is None or client.is_closed:
+        # HTTP/2 multiplexes concurrent tests and status polls over one kept-alive connection
+        client = _CLIENTS[loop] = httpx.AsyncClient(
+            timeout=DEFAULT_TIMEOUT,
+            headers={"Accept": "application/json", "Accept-Encoding": "gzip"},
+            transport=RetryingTransport(
+                http2=True,
+                retries=RETRY_TOTAL,  # Failed connection attempts
+                limits=httpx.Limits(max_connections=32, max_keepalive_connections=16)
+            )
+        )
+    return client
+
+async def close_client() -> None:
+    """Close the running event loop's shared client"""
+    client = _CLIENTS.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
@@ -0,0 +1,94 @@
+"""
+Lead API helpers shared by the Lead Generation System test scripts
+"""
+
+import asyncio
+import httpx
+import orjson
+import time
+from aiolimiter import AsyncLimiter
+from typing import Any, Callable, Dict, Optional
+
+from http_client import JSON_HEADERS, json_body
+
+ANALYSIS_DONE_STATUSES = ("completed", "failed")
+
+# Creates trigger OpenAI calls behind the backend's own rate ceiling, so lead requests are paced client-side
+LEAD_REQUESTS_PER_MINUTE = 30
+_limiter = AsyncLimiter(LEAD_REQUESTS_PER_MINUTE, 60)
+
+# Pending GETs keyed by URL, so concurrent callers reading the same lead share one request
+_inflight: Dict[str, "asyncio.Future[httpx.Response]"] = {}
+
+async def create_lead(client: httpx.AsyncClient, leads_url: str, body: bytes) -> httpx.Response:
+    """POST an already-serialized lead within the request rate limit"""
+    async with _limiter:
+        return await client.post(leads_url, content=body, headers=JSON_HEADERS)
+
+async def _limited_get(client: httpx.AsyncClient, lead_url: str) -> httpx.Response:
+    async with _limiter:
+        return await client.get(lead_url)
+
+async def get_lead(client: httpx.AsyncClient, lead_url: str) -> httpx.Response:
+    """GET a lead within the request rate limit, joining an identical GET that is already in flight"""
+    pending = _inflight.get(lead_url)
+    if pending is None:
+        pending = asyncio.ensure_future(_limited_get(client, lead_url))
+        _inflight[lead_url] = pending
+        pending.add_done_callback(lambda _: _inflight.pop(lead_url, None))
+    # Shielded so one caller being cancelled doesn't cancel the request the others are waiting on
+    return await asyncio.shield(pending)
+
+async def wait_for_analysis(
+    client: httpx.AsyncClient,
+    lead_url: str,
+    timeout: float = 45,
+    on_status: Optional[Callable[[float, Dict[str, Any]], None]] = None,
+    base: float = 0.25,
+    cap: float = 2.0
+) -> Optional[Dict[str, Any]]:
+    """Wait for a lead's analysis to finish and return the lead; on timeout return the last state seen, if any"""
+    start = time.monotonic()
+    deadline = start + timeout
+    last_seen: Optional[Dict[str, Any]] = None
+
+    def is_done(lead: Dict[str, Any]) -> bool:
+        nonlocal last_seen
+        last_seen = lead
+        if on_status:
+            on_status(time.monotonic() - start, lead)
+        return lead.get('analysis_status') in ANALYSIS_DONE_STATUSES
+
+    try:
+        if on_status is None:
+            # Only the outcome matters: one long-poll GET that the backend holds until the analysis is done
+            await _limiter.acquire()
+            response = await client.get(
+                lead_url,
+                params={"wait": "completed", "timeout": str(int(timeout))},
+                timeout=httpx.Timeout(timeout + 5, connect=3.05)
+            )
+            if response.status_code == 200 and is_done(json_body(response)):
+                return last_seen
+        else:
+            # Every state change matters: the server-sent event stream pushes each one as it happens
+            await _limiter.acquire()
+            async with client.stream("GET", f"{lead_url}/stream", timeout=httpx.Timeout(timeout, connect=3.05)) as response:
+                if response.status_code == 200:
+                    async for line in response.aiter_lines():
+                        if line.startswith("data: ") and is_done(orjson.loads(line[len("data: "):])):
+                            return last_seen
+                        if time.monotonic() >= deadline:
+                            return last_seen
+    except httpx.HTTPError:
+        pass
+
+    # Fall back to polling with exponential backoff
+    attempt = 0
+    while time.monotonic() < deadline:
+        await asyncio.sleep(min(cap, base * 2 ** attempt, max(0.0, deadline - time.monotonic())))
+        attempt += 1
+        check_response = await get_lead(client, lead_url)
+        if check_response.status_code == 200 and is_done(json_body(check_response)):
+            return last_seen
+    return last_seen
@@ -3,31 +3,27 @@
 OpenAI Integration Test for Lead Generation System
 """
 
-import requests
-import json
-import time
+import asyncio
+import orjson
 import os
+import sys
+import textwrap
+import time
 from dotenv import load_dotenv
+from http_client import close_client, get_client, json_body
+from lead_client import create_lead, wait_for_analysis
 
 # Load environment variables
 load_dotenv('/app/frontend/.env')
 
 BACKEND_URL = os.getenv('REACT_APP_BACKEND_URL', 'https://c84c520d-1762-489e-bb0d-6c5ed7a967cd.preview.emergentagent.com')
 API_BASE_URL = f"{BACKEND_URL}/api"
+LEADS_URL = f"{API_BASE_URL}/leads"
+LEAD_URL_FMT = LEADS_URL + "/{}"
 
-def test_openai_integration():
-    """Test OpenAI integration with realistic business content"""
-    print("🔍 Testing OpenAI Integration...")
-    
-    # Create lead with substantial content for AI analysis
-    lead_data = {
-        "company_name": "DataFlow Analytics",
-        "industry": "Data Analytics & Business Intelligence",
-        "company_size": "50-200 employees",
-        "decision_maker_name": "Jennifer Martinez",
-        "decision_maker_title": "Chief Data Officer",
-        "linkedin_url": "https://linkedin.com/in/jennifer-martinez-cdo",
-        "manual_content": """
+# Lead with substantial content for AI analysis, serialized once at import;
+# no_cache makes the backend call OpenAI even if this content was analyzed before
+LEAD_CONTENT = sys.intern(textwrap.dedent("""
         DataFlow Analytics is experiencing rapid growth but facing significant data infrastructure challenges:
         
         Recent company updates:
@@ -51,50 +47,62 @@ def test_openai_integration():
         - Multiple job postings for senior data engineers
         
         This appears to be a high-priority lead with immediate budget and decision-making authority.
-        """
-    }
+        """).strip())
+LEAD_BYTES = orjson.dumps({
+    "company_name": "DataFlow Analytics",
+    "industry": "Data Analytics & Business Intelligence",
+    "company_size": "50-200 employees",
+    "decision_maker_name": "Jennifer Martinez",
+    "decision_maker_title": "Chief Data Officer",
+    "linkedin_url": "https://linkedin.com/in/jennifer-martinez-cdo",
+    "manual_content": LEAD_CONTENT,
+    "no_cache": True
+})
+
+async def run_openai_integration():
+    """Test OpenAI integration with realistic business content"""
+    print("🔍 Testing OpenAI Integration...")
     
+    client = get_client()
     try:
         # Create lead
-        response = requests.post(f"{API_BASE_URL}/leads", json=lead_data)
+        response = await create_lead(client, LEADS_URL, LEAD_BYTES)
         
         if response.status_code == 200:
-            data = response.json()
+            data = json_body(response)
             lead_id = data["id"]
             print(f"✅ Lead created: {lead_id}")
             print(f"   Initial status: {data.get('analysis_status', 'unknown')}")
             
-            # Monitor analysis progress
-            for i in range(6):  # Check for up to 30 seconds
-                time.sleep(5)
-                check_response = requests.get(f"{API_BASE_URL}/leads/{lead_id}")
+            # Wait for the analysis with one long-poll request
+            started = time.monotonic()
+            check_data = await wait_for_analysis(client, LEAD_URL_FMT.format(lead_id), timeout=30)
+            
+            if check_data:
+                status = check_data.get('analysis_status', 'unknown')
+                print(f"   Status after {time.monotonic() - started:.0f}s: {status}")
+                
+                if status == "completed":
+                    print("✅ AI Analysis completed successfully!")
+                    pain_points = check_data.get('pain_points', [])
+                    coldness_score = check_data.get('coldness_score')
+                    total_score = check_data.get('total_lead_score')
+                    outreach_angle = check_data.get('best_outreach_angle', '')
+                
+                    print(f"   📊 Results:")
+                    print(f"      Pain points identified: {len(pain_points)}")
+                    for pp in pain_points[:3]:  # Show first 3
+                        print(f"        - {pp.get('description', 'N/A')} (Urgency: {pp.get('urgency', 'N/A')})")
+                    print(f"      Coldness score: {coldness_score}")
+                    print(f"      Total lead score: {total_score}")
+                    print(f"      Outreach angle: {outreach_angle[:100]}...")
+                
+                    return True
+                
+                elif status == "failed":
+                    print("❌ AI Analysis failed!")
+                    return False
                 
-                if check_response.status_code == 200:
-                    check_data = check_response.json()
-                    status = check_data.get('analysis_status', 'unknown')
-                    print(f"   Status after {(i+1)*5}s: {status}")
-                    
-                    if status == "completed":
-                        print("✅ AI Analysis completed successfully!")
-                        pain_points = check_data.get('pain_points', [])
-                        coldness_score = check_data.get('coldness_score')
-                        total_score = check_data.get('total_lead_score')
-                        outreach_angle = check_data.get('best_outreach_angle', '')
-                        
-                        print(f"   📊 Results:")
-                        print(f"      Pain points identified: {len(pain_points)}")
-                        for pp in pain_points[:3]:  # Show first 3
-                            print(f"        - {pp.get('description', 'N/A')} (Urgency: {pp.get('urgency', 'N/A')})")
-                        print(f"      Coldness score: {coldness_score}")
-                        print(f"      Total lead score: {total_score}")
-                        print(f"      Outreach angle: {outreach_angle[:100]}...")
-                        
-                        return True
-                        
-                    elif status == "failed":
-                        print("❌ AI Analysis failed!")
-                        return False
-                        
             print("⚠️  Analysis did not complete within 30 seconds")
             return False
             
@@ -107,8 +115,19 @@ def test_openai_integration():
         print(f"❌ Error testing OpenAI integration: {str(e)}")
         return False
 
+async def main():
+    """Run the integration test, then close the shared client on the same event loop"""
+    try:
+        return await run_openai_integration()
+    finally:
+        await close_client()
+
+def test_openai_integration():
+    """pytest entry point: run the integration test on its own event loop"""
+    assert asyncio.run(main())
+
 if __name__ == "__main__":
-    success = test_openai_integration()
+    success = asyncio.run(main())
     if not success:
         print("\n🚨 OpenAI Integration Issue Detected!")
         print("   This is likely due to an invalid or expired OpenAI API key.")